@@ -4,12 +4,85 @@ import tkinter as tk
 from tkinter import scrolledtext, ttk
 from pathlib import Path
 import fnmatch
+import glob
+import re
+import shutil
+import subprocess
+import sys
 import threading
 import time
+from collections import deque
 
 SETTINGS_FILE = "settings.json"
 HISTORY_LIMIT = 20
 
+# 拡張子（拡張子なしの場合はファイル名）ごとのコメント構文
+COMMENT_STYLES = {
+    "py": "python",
+    "pyw": "python",
+    "sh": "hash",
+    "bash": "hash",
+    "zsh": "hash",
+    "rb": "hash",
+    "pl": "hash",
+    "r": "hash",
+    "ps1": "hash",
+    "yaml": "hash",
+    "yml": "hash",
+    "toml": "hash",
+    "cfg": "hash",
+    "conf": "hash",
+    "dockerfile": "hash",
+    "makefile": "hash",
+    "c": "c",
+    "h": "c",
+    "cc": "c",
+    "cpp": "c",
+    "cxx": "c",
+    "hpp": "c",
+    "cs": "textblock",
+    "java": "textblock",
+    "kt": "textblock",
+    "kts": "textblock",
+    "scala": "textblock",
+    "swift": "textblock",
+    "go": "c",
+    "rs": "c",
+    "dart": "dart",
+    "php": "c",
+    "js": "c",
+    "mjs": "c",
+    "cjs": "c",
+    "jsx": "c",
+    "ts": "c",
+    "tsx": "c",
+    "scss": "scss",
+    "less": "scss",
+    "css": "css",
+    "html": "markup",
+    "htm": "markup",
+    "xml": "markup",
+    "vue": "markup",
+}
+
+COMMENT_SYNTAX = {
+    # line: 行コメント, block: ブロックコメント, quotes: 1行文字列, multiline: 複数行文字列
+    # line_needs_space: 行頭か空白の直後の記号だけを行コメントとみなす, brackets: 括弧の深さを追跡する
+    "python": {"line": "#", "block": None, "quotes": "'\"", "multiline": ('"""', "'''"), "docstrings": True, "brackets": True},
+    "hash": {"line": "#", "block": None, "quotes": "'\"", "multiline": (), "line_needs_space": True},
+    "c": {"line": "//", "block": ("/*", "*/"), "quotes": "'\"", "multiline": ("`",)},
+    # Java/Kotlin/Scala/Swift/C# のテキストブロック
+    "textblock": {"line": "//", "block": ("/*", "*/"), "quotes": "'\"", "multiline": ('"""',)},
+    "dart": {"line": "//", "block": ("/*", "*/"), "quotes": "'\"", "multiline": ('"""', "'''")},
+    # url(http://...) の // はコメントではない
+    "scss": {"line": "//", "block": ("/*", "*/"), "quotes": "'\"", "multiline": (), "line_needs_space": True},
+    "css": {"line": None, "block": ("/*", "*/"), "quotes": "'\"", "multiline": ()},
+    "markup": {"line": None, "block": ("<!--", "-->"), "quotes": "", "multiline": ()},
+}
+
+PYTHON_HEADER = re.compile(r"(async\s+def|def|class)\b")
+DOCSTRING_START = re.compile(r"[rRuU]?('''|\"\"\"|'|\")")
+
 
 def read_gitignore(directory):
     """
@@ -118,6 +191,213 @@ def matches_pattern(filename, patterns, is_exclude=False):
     return False
 
 
+_TOKEN_PATTERNS = {}
+
+
+def get_token_pattern(style):
+    """
+    コメント構文ごとの字句パターン（エスケープ・文字列・コメント記号）を返す
+    """
+    if style not in _TOKEN_PATTERNS:
+        syntax = COMMENT_SYNTAX[style]
+        tokens = list(syntax["multiline"]) + list(syntax["quotes"])
+        if syntax["line"]:
+            tokens.append(syntax["line"])
+        if syntax["block"]:
+            tokens.extend(syntax["block"])
+        if syntax.get("brackets"):
+            tokens.extend("()[]{}")
+        tokens.sort(key=len, reverse=True)
+        _TOKEN_PATTERNS[style] = re.compile("|".join([r"\\."] + [re.escape(token) for token in tokens]))
+    return _TOKEN_PATTERNS[style]
+
+
+def strip_line_comments(line, style, state):
+    """
+    1行からコメントを取り除く
+    state: 行をまたぐ状態（ブロックコメント中、複数行文字列中、括弧の深さ）を保持する辞書
+    """
+    syntax = COMMENT_SYNTAX[style]
+    block_open, block_close = syntax["block"] or (None, None)
+    parts = []
+    pos = 0
+    quote = None
+
+    for match in get_token_pattern(style).finditer(line):
+        token = match.group()
+        start = match.start()
+
+        if state["block"]:
+            if token == block_close:
+                state["block"] = False
+                pos = match.end()
+                # コメントで区切られていたトークン同士がくっつかないようにする
+                if parts and parts[-1] and not parts[-1][-1].isspace():
+                    parts.append(" ")
+            continue
+        if state["string"]:
+            if token == state["string"]:
+                state["string"] = None
+            continue
+        if quote:
+            if token == quote:
+                quote = None
+            continue
+        if token.startswith("\\"):
+            continue
+
+        if token in ("(", "[", "{"):
+            state["depth"] += 1
+        elif token in (")", "]", "}"):
+            state["depth"] = max(state["depth"] - 1, 0)
+        elif token in syntax["multiline"]:
+            state["string"] = token
+        elif token in syntax["quotes"]:
+            quote = token
+        elif token == syntax["line"]:
+            # シェル等では "$#" のような単語途中の # はコメントではない
+            if syntax.get("line_needs_space") and start > 0 and not line[start - 1].isspace():
+                continue
+            parts.append(line[pos:start])
+            return "".join(parts)
+        elif token == block_open:
+            parts.append(line[pos:start])
+            state["block"] = True
+
+    if not state["block"]:
+        parts.append(line[pos:])
+    return "".join(parts)
+
+
+def find_string_end(text, pos, delimiter):
+    """
+    pos以降で文字列リテラルの閉じ記号を探し、その直後の位置を返す（見つからなければ-1）
+    """
+    index = pos
+    while index < len(text):
+        if text[index] == "\\":
+            index += 2
+            continue
+        if text.startswith(delimiter, index):
+            return index + len(delimiter)
+        index += 1
+    return -1
+
+
+def reduce_lines(lines, filename, options):
+    """
+    行を1パスで縮約するジェネレータ
+    コメント（Pythonではdocstringも）、末尾の空白、連続する空行を取り除く
+    複数行文字列の中身はそのまま残す
+    """
+    file_ext = os.path.splitext(filename)[1].lstrip(".").lower()
+    style = COMMENT_STYLES.get(file_ext or filename.lower())
+    strip_comments = style is not None and options.get("strip_comments", False)
+    docstrings = strip_comments and COMMENT_SYNTAX[style].get("docstrings", False)
+    # Markdownの改行やパッチの空行のように空白に意味がある形式は詰めない
+    compact = style is not None and options.get("compact_whitespace", False)
+
+    state = {"block": False, "string": None, "docstring": None, "depth": 0}
+    docstring_allowed = True  # ファイル先頭、またはdef/classヘッダの直後
+    in_header = False
+    pending_blank = False  # 連続空行は次の非空行の直前に1行だけ出す（先頭・末尾の空行は落とす）
+    emitted = False
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        started_in_string = state["string"] is not None
+
+        if style:
+            if state["docstring"]:
+                if state["docstring"] in line:
+                    state["docstring"] = None
+                continue
+
+            stripped = line.lstrip()
+
+            # 括弧の外で、ファイル先頭かdef/classヘッダ直後の文字列リテラルだけをdocstringとみなす
+            if docstrings and docstring_allowed and not started_in_string and not state["depth"]:
+                match = DOCSTRING_START.match(stripped)
+                if match:
+                    delimiter = match.group(1)
+                    end = find_string_end(stripped, match.end(), delimiter)
+                    if end == -1 and len(delimiter) == 3:
+                        state["docstring"] = delimiter
+                        docstring_allowed = False
+                        continue
+                    # 行全体が文字列リテラルの場合だけ削除する（"".join(...) などは残す）
+                    rest = stripped[end:].strip() if end != -1 else None
+                    if rest is not None and (not rest or rest.startswith("#")):
+                        docstring_allowed = False
+                        continue
+
+            code = strip_line_comments(line, style, state)
+
+            if strip_comments:
+                if stripped and not code.strip():
+                    continue  # コメントだけの行は行ごと削除
+                line = code
+
+            if docstrings and code.strip():
+                if not started_in_string and PYTHON_HEADER.match(code.lstrip()):
+                    in_header = True
+                if state["depth"] or state["string"]:
+                    docstring_allowed = False
+                else:
+                    docstring_allowed = in_header and code.rstrip().endswith(":")
+                    in_header = False
+
+        # 行末が複数行文字列の中なら、末尾の空白も空行も文字列の一部なので残す
+        if compact and not state["string"]:
+            line = line.rstrip()
+            if not line:
+                pending_blank = emitted
+                continue
+        if pending_blank:
+            yield "\n"
+            pending_blank = False
+        emitted = True
+
+        yield line + "\n"
+
+
+def truncate_lines(lines, head_lines, tail_lines):
+    """
+    先頭head_lines行と末尾tail_lines行だけを残し、間は省略した行数の注記に置き換える
+    """
+    lines = iter(lines)
+    for _ in range(head_lines):
+        line = next(lines, None)
+        if line is None:
+            return
+        yield line
+
+    tail = deque(maxlen=tail_lines)
+    omitted = 0
+    for line in lines:
+        if len(tail) == tail_lines:
+            omitted += 1
+        tail.append(line)
+
+    if omitted:
+        yield f"... [{omitted} lines omitted] ...\n"
+    yield from tail
+
+
+def reduce_content(lines, filename, options):
+    """
+    ファイル内容の縮約ステージ（読み込みと出力の間で適用する）
+    """
+    reduced = reduce_lines(lines, filename, options)
+
+    head_lines = options.get("head_lines", 0)
+    tail_lines = options.get("tail_lines", 0)
+    if head_lines or tail_lines:
+        reduced = truncate_lines(reduced, head_lines, tail_lines)
+
+    return "".join(reduced)
+
+
 def count_files(directory, include_patterns, exclude_patterns, exclude_dir_patterns=None, respect_gitignore=False):
     """
     処理対象ファイル数を事前にカウントする（改善版）
@@ -139,7 +419,7 @@ def count_files(directory, include_patterns, exclude_patterns, exclude_dir_patte
 
             # ディレクトリパスを構築して除外チェック
             dir_path = os.path.join(root, d)
-            if should_exclude_directory(dir_path, exclude_dir_patterns):
+            if should_exclude_directory(dir_path, exclude_dir_patterns, directory):
                 dirs_to_remove.append(d)
 
         # dirsリストから除外ディレクトリを削除（os.walkは残ったディレクトリのみ再帰）
@@ -166,32 +446,11 @@ def count_files(directory, include_patterns, exclude_patterns, exclude_dir_patte
     return count
 
 
-def get_files_and_content(directory, include_patterns, exclude_patterns, exclude_dir_patterns=None, respect_gitignore=False, progress_callback=None):
+def iter_target_files(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, ignored_patterns, scan_stats):
     """
-    最適化版：カウントと読み込みを同時に行う
+    除外ディレクトリを刈り込みながら走査し、対象ファイルの (フルパス, 相対パス, ファイル名) を返すジェネレータ
+    パターンは前処理済みのものを渡す。スキップしたディレクトリ数はscan_statsに加算する
     """
-    output = []
-    ignored_patterns = read_gitignore(directory) if respect_gitignore else set()
-
-    include_patterns = [p.strip() for p in include_patterns if p.strip()]
-    exclude_patterns = [p.strip() for p in exclude_patterns if p.strip()]
-    exclude_dir_patterns = [p.strip() for p in (exclude_dir_patterns or []) if p.strip()]
-
-    print("\n=== Starting file scan ===")
-    print(f"Directory: {directory}")
-    print(f"Include patterns: {include_patterns}")
-    print(f"Exclude patterns: {exclude_patterns}")
-    print(f"Exclude directory patterns: {exclude_dir_patterns}")
-    print(f"Respect .gitignore: {respect_gitignore}")
-
-    processed_files = 0
-    skipped_dirs = 0
-
-    if progress_callback:
-        progress_callback("Scanning files...", 0, 0)
-
-    start_time = time.time()
-
     for root, dirs, files in os.walk(directory):
         # 現在のディレクトリを表示（デバッグ用）
         current_dir = os.path.relpath(root, directory)
@@ -224,7 +483,7 @@ def get_files_and_content(directory, include_patterns, exclude_patterns, exclude
 
                 if should_ignore:
                     dirs_to_remove.append(d)
-                    skipped_dirs += 1
+                    scan_stats["skipped_dirs"] += 1
                     print(f"  Skipping directory (gitignore): {d}")
 
             for d in dirs_to_remove:
@@ -235,13 +494,13 @@ def get_files_and_content(directory, include_patterns, exclude_patterns, exclude
         for d in dirs[:]:
             if d == ".git":
                 dirs_to_remove.append(d)
-                skipped_dirs += 1
+                scan_stats["skipped_dirs"] += 1
                 continue
 
             dir_path = os.path.join(root, d)
-            if should_exclude_directory(dir_path, exclude_dir_patterns):
+            if should_exclude_directory(dir_path, exclude_dir_patterns, directory):
                 dirs_to_remove.append(d)
-                skipped_dirs += 1
+                scan_stats["skipped_dirs"] += 1
                 print(f"  Skipping directory (exclude pattern): {d}")
 
         for d in dirs_to_remove:
@@ -264,40 +523,280 @@ def get_files_and_content(directory, include_patterns, exclude_patterns, exclude
             if respect_gitignore and should_ignore_file(relative_path, ignored_patterns):
                 continue
 
-            # ファイルを処理
-            processed_files += 1
-            if progress_callback and processed_files % 10 == 0:  # 10ファイルごとに更新
-                progress_callback(f"Processing: {relative_path}", processed_files, processed_files)
+            yield file_path, relative_path, filename
 
-            output.append(("title", "########\n"))
-            output.append(("title", f"# {relative_path}\n"))
-            output.append(("title", "########\n"))
 
-            try:
-                with open(file_path, "r", encoding="utf8") as f:
+def get_files_and_content(directory, include_patterns, exclude_patterns, exclude_dir_patterns=None, respect_gitignore=False, progress_callback=None, reduce_options=None, stats=None):
+    """
+    最適化版：カウントと読み込みを同時に行う
+    reduce_options: 指定した場合、読み込んだ内容をreduce_contentで縮約してから出力する
+    stats: 指定した場合、縮約前後のバイト数などを書き込む辞書
+    """
+    output = []
+    ignored_patterns = read_gitignore(directory) if respect_gitignore else set()
+
+    include_patterns = [p.strip() for p in include_patterns if p.strip()]
+    exclude_patterns = [p.strip() for p in exclude_patterns if p.strip()]
+    exclude_dir_patterns = [p.strip() for p in (exclude_dir_patterns or []) if p.strip()]
+
+    print("\n=== Starting file scan ===")
+    print(f"Directory: {directory}")
+    print(f"Include patterns: {include_patterns}")
+    print(f"Exclude patterns: {exclude_patterns}")
+    print(f"Exclude directory patterns: {exclude_dir_patterns}")
+    print(f"Respect .gitignore: {respect_gitignore}")
+    print(f"Reduce options: {reduce_options}")
+
+    processed_files = 0
+    bytes_before = 0
+    bytes_after = 0
+
+    if progress_callback:
+        progress_callback("Scanning files...", 0, 0)
+
+    start_time = time.time()
+
+    scan_stats = {"skipped_dirs": 0}
+    for file_path, relative_path, filename in iter_target_files(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, ignored_patterns, scan_stats):
+        # ファイルを処理
+        processed_files += 1
+        if progress_callback and processed_files % 10 == 0:  # 10ファイルごとに更新
+            progress_callback(f"Processing: {relative_path}", processed_files, processed_files)
+
+        output.append(("title", "########\n"))
+        output.append(("title", f"# {relative_path}\n"))
+        output.append(("title", "########\n"))
+
+        try:
+            with open(file_path, "r", encoding="utf8") as f:
+                if reduce_options:
+                    # 縮約前後とも読み込んだ（改行をLFに揃えた）テキストで数える
+                    read_bytes = [0]
+                    content = reduce_content(count_read_bytes(f, read_bytes), filename, reduce_options)
+                    content_bytes = len(content.encode("utf8"))
+                    bytes_before += read_bytes[0]
+                    bytes_after += content_bytes
+                else:
                     content = f.read()
-                    output.append(("content", content))
-                    output.append(("content", "\n\n"))
-            except UnicodeDecodeError:
-                output.append(("content", f"[Binary file or encoding error: {relative_path}]\n\n"))
-            except Exception as e:
-                output.append(("content", f"[Error reading file: {relative_path} - {str(e)}]\n\n"))
+                    content_bytes = len(content.encode("utf8"))
+                    bytes_before += content_bytes
+                    bytes_after += content_bytes
+            output.append(("content", content))
+            output.append(("content", "\n\n"))
+        except UnicodeDecodeError:
+            output.append(("content", f"[Binary file or encoding error: {relative_path}]\n\n"))
+        except Exception as e:
+            output.append(("content", f"[Error reading file: {relative_path} - {str(e)}]\n\n"))
 
     elapsed_time = time.time() - start_time
     print("\n=== Scan completed ===")
     print(f"Processed files: {processed_files}")
-    print(f"Skipped directories: {skipped_dirs}")
+    print(f"Skipped directories: {scan_stats['skipped_dirs']}")
+    print(f"Bytes: {format_byte_summary(bytes_before, bytes_after, bool(reduce_options))}")
     print(f"Time elapsed: {elapsed_time:.2f} seconds")
 
+    if stats is not None:
+        stats.update(files=processed_files, bytes_before=bytes_before, bytes_after=bytes_after, reduced=bool(reduce_options))
+
     if progress_callback:
         progress_callback("Completed!", processed_files, processed_files)
 
     return output
 
 
-def should_exclude_directory(path, exclude_dir_patterns):
+def get_manifest(directory, include_patterns, exclude_patterns, exclude_dir_patterns=None, respect_gitignore=False, progress_callback=None, stats=None):
+    """
+    ファイルを開かずにstatだけでディレクトリごとのファイル数・合計バイト数を集計する
+    戻り値は (出力, ディレクトリ行ごとの相対パスのリスト)
+    """
+    ignored_patterns = read_gitignore(directory) if respect_gitignore else set()
+
+    include_patterns = [p.strip() for p in include_patterns if p.strip()]
+    exclude_patterns = [p.strip() for p in exclude_patterns if p.strip()]
+    exclude_dir_patterns = [p.strip() for p in (exclude_dir_patterns or []) if p.strip()]
+
+    print("\n=== Starting manifest scan ===")
+    print(f"Directory: {directory}")
+
+    if progress_callback:
+        progress_callback("Scanning files...", 0, 0)
+
+    start_time = time.time()
+
+    tree = {"files": 0, "bytes": 0, "children": {}}
+    scan_stats = {"skipped_dirs": 0}
+    for file_path, relative_path, _ in iter_target_files(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, ignored_patterns, scan_stats):
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            continue
+
+        # ルートから親ディレクトリまでの各ノードに加算
+        node = tree
+        node["files"] += 1
+        node["bytes"] += size
+        for part in Path(relative_path).parts[:-1]:
+            child = node["children"].get(part)
+            if child is None:
+                child = node["children"][part] = {"files": 0, "bytes": 0, "children": {}}
+            node = child
+            node["files"] += 1
+            node["bytes"] += size
+
+        if progress_callback and tree["files"] % 100 == 0:  # 100ファイルごとに更新
+            progress_callback(f"Scanning: {relative_path}", tree["files"], tree["files"])
+
+    output, dir_paths = render_manifest(tree, directory)
+
+    elapsed_time = time.time() - start_time
+    print("\n=== Manifest completed ===")
+    print(f"Files: {tree['files']} ({format_size(tree['bytes'])})")
+    print(f"Skipped directories: {scan_stats['skipped_dirs']}")
+    print(f"Time elapsed: {elapsed_time:.2f} seconds")
+
+    if stats is not None:
+        stats.update(files=tree["files"], bytes=tree["bytes"])
+
+    if progress_callback:
+        progress_callback("Completed!", tree["files"], tree["files"])
+
+    return output, dir_paths
+
+
+def render_manifest(tree, directory):
+    """
+    集計したツリーをサイズの大きい順に字下げして出力する
+    ディレクトリ行には "dir" と、dir_pathsの位置を示す "dir-<n>" の2つのタグを付ける
+    """
+    output = [("title", f"{format_size(tree['bytes']):>10} {tree['files']:>8} files  {directory}\n")]
+    dir_paths = []
+
+    def render(node, path, depth):
+        children = sorted(node["children"].items(), key=lambda item: item[1]["bytes"], reverse=True)
+        for name, child in children:
+            child_path = os.path.join(path, name) if path else name
+            output.append((("dir", f"dir-{len(dir_paths)}"), f"{format_size(child['bytes']):>10} {child['files']:>8} files  {'    ' * depth}{name}/\n"))
+            dir_paths.append(child_path)
+            render(child, child_path, depth + 1)
+
+    render(tree, "", 1)
+    return output, dir_paths
+
+
+def format_size(num_bytes):
+    """
+    バイト数を読みやすい単位の文字列にする
+    """
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def count_read_bytes(lines, counter):
+    """
+    読み込んだ行のバイト数をcounter[0]に加算しながらそのまま返すジェネレータ
+    """
+    for line in lines:
+        counter[0] += len(line.encode("utf8"))
+        yield line
+
+
+def format_byte_summary(bytes_before, bytes_after, reduced):
+    """
+    縮約前後のバイト数を表示用の文字列にする（縮約していなければバイト数のみ）
+    """
+    if not reduced:
+        return f"{bytes_before:,} bytes"
+    if not bytes_before:
+        return f"{bytes_before:,} -> {bytes_after:,} bytes"
+    reduction = (1 - bytes_after / bytes_before) * 100
+    return f"{bytes_before:,} -> {bytes_after:,} bytes ({reduction:.1f}% reduced)"
+
+
+def write_output(output, stream, encoding):
+    """
+    出力バッファをストリームへ順に書き出す（全体を結合した文字列は作らない）
+    戻り値は書き込んだバイト数
+    """
+    written = 0
+    for _, content in output:
+        data = content.encode(encoding)
+        stream.write(data)
+        written += len(data)
+    return written
+
+
+def save_output(output, path):
+    """
+    出力バッファをファイルへ直接書き出す
+    """
+    with open(path, "wb") as f:
+        return write_output(output, f, "utf8")
+
+
+def get_clipboard_command():
+    """
+    利用可能なクリップボードコマンドとその入力エンコーディングを返す（見つからなければNone）
+    """
+    if sys.platform == "win32":
+        return ["clip"], "utf-16-le"
+    if sys.platform == "darwin":
+        return ["pbcopy"], "utf8"
+
+    candidates = [["xclip", "-selection", "clipboard"], ["xsel", "--clipboard", "--input"]]
+    if os.environ.get("WAYLAND_DISPLAY"):
+        candidates.insert(0, ["wl-copy"])
+    for command in candidates:
+        if shutil.which(command[0]):
+            return command, "utf8"
+    return None
+
+
+def copy_output_to_clipboard(output):
+    """
+    出力バッファをクリップボードコマンドへパイプで流し込む（Tkのクリップボードを経由しない）
+    戻り値は書き込んだバイト数
+    """
+    clipboard = get_clipboard_command()
+    if clipboard is None:
+        raise RuntimeError("No clipboard command found (clip, pbcopy, wl-copy, xclip or xsel)")
+
+    command, encoding = clipboard
+    options = {"creationflags": subprocess.CREATE_NO_WINDOW} if sys.platform == "win32" else {}
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **options)
+    written = 0
+    broken_pipe = False
+    try:
+        # clip.exeはBOM付きUTF-16であればUnicodeとして受け取る
+        if encoding == "utf-16-le":
+            process.stdin.write("\ufeff".encode(encoding))
+        for _, content in output:
+            data = content.encode(encoding)
+            process.stdin.write(data)
+            written += len(data)
+    except BrokenPipeError:
+        broken_pipe = True
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            broken_pipe = True
+        process.wait()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"{command[0]} exited with code {process.returncode}")
+    # 終了コードが0でも、全データを送る前にパイプが閉じられていれば失敗とする
+    if broken_pipe:
+        raise RuntimeError(f"{command[0]} closed its input after {written:,} bytes")
+    return written
+
+
+def should_exclude_directory(path, exclude_dir_patterns, base_directory=None):
     """
     指定されたパスが除外ディレクトリパターンのいずれかにマッチするかチェックする（改善版）
+    "/" で始まるパターンはbase_directoryからの相対パス全体と照合する
     """
     if not exclude_dir_patterns:
         return False
@@ -314,8 +813,13 @@ def should_exclude_directory(path, exclude_dir_patterns):
         if not pattern:
             continue
 
+        # 走査ディレクトリからの相対パスで指定する場合（例: /app/build）
+        if pattern.startswith("/") and base_directory is not None:
+            relative_path = os.path.relpath(path, base_directory).replace("\\", "/")
+            if fnmatch.fnmatch(relative_path, pattern.lstrip("/")):
+                return True
         # パターンがワイルドカードを含む場合
-        if any(c in pattern for c in "*?"):
+        elif any(c in pattern for c in "*?"):
             # ディレクトリ名だけでマッチング
             if fnmatch.fnmatch(dir_name, pattern):
                 return True
@@ -334,7 +838,7 @@ def should_exclude_directory(path, exclude_dir_patterns):
     return False
 
 
-def save_settings(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore):
+def save_settings(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, reduce_options=None):
     """
     設定を保存する
     """
@@ -344,6 +848,7 @@ def save_settings(directory, include_patterns, exclude_patterns, exclude_dir_pat
         "exclude_patterns": exclude_patterns,
         "exclude_dir_patterns": exclude_dir_patterns,
         "respect_gitignore": respect_gitignore,
+        "reduce_options": reduce_options,
     }
 
     if os.path.exists(SETTINGS_FILE):
@@ -384,6 +889,8 @@ class FileContentViewer:
         self.root.geometry("1200x800")
         self.settings = load_settings()
         self.processing = False
+        self.result = []
+        self.manifest_dirs = []
 
         self.create_frames()
         self.create_history_section()
@@ -441,6 +948,10 @@ class FileContentViewer:
         self.btn = tk.Button(input_row1, text="Get Files and Content", command=self.show_result)
         self.btn.pack(side=tk.LEFT)
 
+        # ファイルを読まずにサイズだけ集計するボタン
+        self.manifest_btn = tk.Button(input_row1, text="Manifest", command=self.show_manifest)
+        self.manifest_btn.pack(side=tk.LEFT, padx=(5, 0))
+
         # ディレクトリ選択ボタンを追加
         self.browse_btn = tk.Button(input_row1, text="Browse...", command=self.browse_directory)
         self.browse_btn.pack(side=tk.LEFT, padx=(5, 0))
@@ -482,12 +993,42 @@ class FileContentViewer:
         self.gitignore_check = tk.Checkbutton(input_row3, text="Respect .gitignore", variable=self.gitignore_var)
         self.gitignore_check.pack(side=tk.LEFT, padx=(10, 0))
 
+        # 4行目: 内容の縮約設定と結果サマリー
+        input_row4 = tk.Frame(self.input_frame)
+        input_row4.pack(fill="x", expand=True, pady=(5, 0))
+
+        self.reduce_var = tk.BooleanVar()
+        self.reduce_check = tk.Checkbutton(input_row4, text="Strip comments / blank lines", variable=self.reduce_var)
+        self.reduce_check.pack(side=tk.LEFT)
+
+        head_label = tk.Label(input_row4, text="Head lines:")
+        head_label.pack(side=tk.LEFT, padx=(10, 0))
+
+        self.head_entry = tk.Text(input_row4, height=1, width=6, undo=True, wrap=tk.NONE)
+        self.head_entry.pack(side=tk.LEFT, padx=(2, 10))
+
+        tail_label = tk.Label(input_row4, text="Tail lines:")
+        tail_label.pack(side=tk.LEFT)
+
+        self.tail_entry = tk.Text(input_row4, height=1, width=6, undo=True, wrap=tk.NONE)
+        self.tail_entry.pack(side=tk.LEFT, padx=(2, 10))
+
+        # 結果バッファから直接書き出すボタン
+        self.save_btn = tk.Button(input_row4, text="Save to File...", command=self.save_result)
+        self.save_btn.pack(side=tk.RIGHT)
+
+        self.copy_btn = tk.Button(input_row4, text="Copy All", command=self.copy_result)
+        self.copy_btn.pack(side=tk.RIGHT, padx=(0, 5))
+
+        self.result_label = tk.Label(input_row4, text="", anchor="e")
+        self.result_label.pack(side=tk.RIGHT, fill="x", expand=True, padx=(0, 10))
+
         # Undo/Redoキーバインドを追加
         self.setup_text_widgets()
 
     def setup_text_widgets(self):
         """Textウィジェットの設定"""
-        text_widgets = [self.dir_entry, self.include_entry, self.exclude_entry, self.exclude_dir_entry]
+        text_widgets = [self.dir_entry, self.include_entry, self.exclude_entry, self.exclude_dir_entry, self.head_entry, self.tail_entry]
 
         for widget in text_widgets:
             # Undo/Redoキーバインド
@@ -520,23 +1061,67 @@ class FileContentViewer:
         text_widget.delete("1.0", tk.END)
         text_widget.insert("1.0", value)
 
-    def show_result(self):
-        if self.processing:
-            return
-
+    def get_line_count_value(self, text_widget):
+        """Textウィジェットから行数を取得（空欄・不正な値は0）"""
+        value = self.get_text_value(text_widget)
+        return int(value) if value.isdigit() else 0
+
+    def get_reduce_options(self):
+        """縮約設定を取得（何も有効でなければNone）"""
+        strip = self.reduce_var.get()
+        head_lines = self.get_line_count_value(self.head_entry)
+        tail_lines = self.get_line_count_value(self.tail_entry)
+        if not (strip or head_lines or tail_lines):
+            return None
+
+        return {
+            "strip_comments": strip,
+            "compact_whitespace": strip,
+            "head_lines": head_lines,
+            "tail_lines": tail_lines,
+        }
+
+    def get_scan_inputs(self):
+        """入力欄から走査条件を取得（ディレクトリが未入力ならNone）"""
         directory = self.get_text_value(self.dir_entry)
         if not directory:
             tk.messagebox.showerror("Error", "Please enter a directory path")
-            return
+            return None
 
         include_patterns = [pattern.strip() for pattern in self.get_text_value(self.include_entry).split(",") if pattern.strip()]
         exclude_patterns = [pattern.strip() for pattern in self.get_text_value(self.exclude_entry).split(",") if pattern.strip()]
         exclude_dir_patterns = [pattern.strip() for pattern in self.get_text_value(self.exclude_dir_entry).split(",") if pattern.strip()]
         respect_gitignore = self.gitignore_var.get()
 
-        # 処理開始
+        return directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore
+
+    def show_result(self):
+        if self.processing:
+            return
+
+        inputs = self.get_scan_inputs()
+        if inputs is None:
+            return
+
+        self.start_processing(self.process_files_thread, inputs + (self.get_reduce_options(),))
+
+    def show_manifest(self):
+        if self.processing:
+            return
+
+        inputs = self.get_scan_inputs()
+        if inputs is None:
+            return
+
+        self.start_processing(self.process_manifest_thread, inputs)
+
+    def start_processing(self, target, args):
+        """
+        ボタンとプログレスバーを処理中の状態にして、別スレッドで処理を開始
+        """
         self.processing = True
         self.btn.config(text="Processing...", state="disabled")
+        self.manifest_btn.config(state="disabled")
         self.progress_frame.pack(fill="x", padx=5, pady=5, before=self.text_frame)
 
         # プログレスバーをリセット
@@ -544,9 +1129,18 @@ class FileContentViewer:
         self.status_label.config(text="Starting...")
 
         # 別スレッドで処理を開始
-        thread = threading.Thread(target=self.process_files_thread, args=(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore), daemon=True)
+        thread = threading.Thread(target=target, args=args, daemon=True)
         thread.start()
 
+    def finish_processing(self):
+        """
+        処理完了後の状態に戻す
+        """
+        self.processing = False
+        self.btn.config(text="Get Files and Content", state="normal")
+        self.manifest_btn.config(state="normal")
+        self.progress_frame.pack_forget()
+
     def select_history(self, event):
         selected_dir = self.history_var.get()
         for setting in self.settings:
@@ -563,6 +1157,12 @@ class FileContentViewer:
 
                 self.gitignore_var.set(setting.get("respect_gitignore", False))
 
+                # 縮約設定の読み込み
+                reduce_options = setting.get("reduce_options") or {}
+                self.reduce_var.set(reduce_options.get("strip_comments", False))
+                self.set_text_value(self.head_entry, str(reduce_options["head_lines"]) if reduce_options.get("head_lines") else "")
+                self.set_text_value(self.tail_entry, str(reduce_options["tail_lines"]) if reduce_options.get("tail_lines") else "")
+
     def create_progress_section(self):
         # プログレスバー
         self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate", length=400)
@@ -584,6 +1184,10 @@ class FileContentViewer:
         self.text_area.bind("<Control-y>", lambda e: self.safe_edit_redo())
         self.text_area.bind("<Control-Shift-Z>", lambda e: self.safe_edit_redo())
 
+        # マニフェストのディレクトリ行をクリックすると除外ディレクトリに追加
+        self.text_area.tag_config("dir", foreground="blue")
+        self.text_area.tag_bind("dir", "<Button-1>", self.exclude_manifest_dir)
+
         # テキストエリア用の右クリックメニューを追加
         self.add_text_context_menu()
 
@@ -616,6 +1220,9 @@ class FileContentViewer:
         context_menu.add_separator()
         context_menu.add_command(label="Select All", command=lambda: self.text_area.tag_add("sel", "1.0", "end"))
         context_menu.add_command(label="Clear", command=lambda: self.text_area.delete("1.0", tk.END))
+        context_menu.add_separator()
+        context_menu.add_command(label="Copy All (from result)", command=self.copy_result)
+        context_menu.add_command(label="Save to File...", command=self.save_result)
 
         def show_text_context_menu(event):
             try:
@@ -625,6 +1232,43 @@ class FileContentViewer:
 
         self.text_area.bind("<Button-3>", show_text_context_menu)
 
+    def copy_result(self):
+        """結果バッファをクリップボードへ直接コピー（Textウィジェットを経由しない）"""
+        if not self.result:
+            self.result_label.config(text="Nothing to copy")
+            return
+
+        self.run_export(copy_output_to_clipboard, "Copied to clipboard")
+
+    def save_result(self):
+        """結果バッファをファイルへ直接保存（Textウィジェットを経由しない）"""
+        if not self.result:
+            self.result_label.config(text="Nothing to save")
+            return
+
+        import tkinter.filedialog as filedialog
+
+        path = filedialog.asksaveasfilename(title="Save Result", defaultextension=".txt", filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if path:
+            self.run_export(lambda output: save_output(output, path), f"Saved to {path}")
+
+    def run_export(self, export, done_message):
+        """
+        書き出し処理を別スレッドで実行し、結果をラベルに表示する
+        """
+        output = self.result
+        self.result_label.config(text="Exporting...")
+
+        def export_thread():
+            try:
+                written = export(output)
+                message = f"{done_message} ({written:,} bytes)"
+            except Exception as e:
+                message = f"Export failed: {e}"
+            self.root.after(0, lambda: self.result_label.config(text=message))
+
+        threading.Thread(target=export_thread, daemon=True).start()
+
     def update_progress(self, status, current, total):
         """
         プログレスバーとステータスを更新する（メインスレッドで実行）
@@ -642,40 +1286,98 @@ class FileContentViewer:
 
         self.root.after(0, update)
 
-    def process_files_thread(self, directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore):
+    def process_files_thread(self, directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, reduce_options):
         """
         ファイル処理を別スレッドで実行
         """
         try:
-            result = get_files_and_content(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, self.update_progress)
+            stats = {}
+            result = get_files_and_content(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, self.update_progress, reduce_options, stats)
 
             # 結果をメインスレッドで表示
-            self.root.after(0, lambda: self.display_result(result, directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore))
+            self.root.after(0, lambda: self.display_result(result, stats, directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, reduce_options))
 
         except Exception as e:
-            self.root.after(0, lambda: self.handle_error(str(e)))
+            message = str(e)
+            self.root.after(0, lambda: self.handle_error(message))
 
-    def display_result(self, result, directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore):
+    def process_manifest_thread(self, directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore):
         """
-        結果をテキストエリアに表示
+        マニフェストの集計を別スレッドで実行
+        """
+        try:
+            stats = {}
+            result, dir_paths = get_manifest(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, self.update_progress, stats)
+
+            # 結果をメインスレッドで表示
+            self.root.after(0, lambda: self.display_manifest(result, dir_paths, stats))
+
+        except Exception as e:
+            message = str(e)
+            self.root.after(0, lambda: self.handle_error(message))
+
+    def insert_result(self, result):
+        """
+        出力をタグ付きでテキストエリアに挿入
         """
         self.text_area.delete(1.0, tk.END)
 
         for tag, content in result:
-            end_index = self.text_area.index(tk.INSERT)
-            self.text_area.insert(tk.INSERT, content)
-            start_index = self.text_area.index(tk.INSERT)
-            self.text_area.tag_add(tag, end_index, start_index)
+            # tagは1つのタグ名、またはタグ名のタプル
+            self.text_area.insert(tk.INSERT, content, tag)
             if tag == "title":
                 self.text_area.tag_config(tag, background="lightgray")
 
-        self.settings = save_settings(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore)
+        self.result = result
+
+    def display_manifest(self, result, dir_paths, stats):
+        """
+        マニフェストをテキストエリアに表示
+        """
+        self.insert_result(result)
+        self.manifest_dirs = dir_paths
+        self.result_label.config(text=f"Manifest: {stats['files']} files, {format_size(stats['bytes'])} (click a directory to exclude it)")
+
+        self.finish_processing()
+
+    def exclude_manifest_dir(self, event):
+        """
+        クリックされたマニフェストのディレクトリを除外ディレクトリ欄に追加
+        行に付けた "dir-<n>" タグから対象を求めるので、テキストを編集した後でもずれない
+        """
+        tags = self.text_area.tag_names(f"@{event.x},{event.y}")
+        indexes = [int(tag[4:]) for tag in tags if tag.startswith("dir-")]
+        if not indexes or indexes[0] >= len(self.manifest_dirs):
+            return
+
+        relative_path = self.manifest_dirs[indexes[0]].replace(os.sep, "/")
+
+        # 除外ディレクトリ欄はカンマ区切りなので、カンマを含む名前は追加できない
+        if "," in relative_path:
+            self.result_label.config(text=f"Cannot exclude '{relative_path}': directory names with commas are not supported")
+            return
+
+        # 走査ディレクトリからの相対パスとして固定し、[ ] * ? はエスケープする
+        pattern = "/" + glob.escape(relative_path)
+        patterns = [p.strip() for p in self.get_text_value(self.exclude_dir_entry).split(",") if p.strip()]
+        if pattern not in patterns:
+            patterns.append(pattern)
+            self.set_text_value(self.exclude_dir_entry, ", ".join(patterns))
+        self.result_label.config(text=f"Excluded directory: {pattern}")
+
+    def display_result(self, result, stats, directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, reduce_options):
+        """
+        結果をテキストエリアに表示
+        """
+        self.insert_result(result)
+        self.manifest_dirs = []
+        self.result_label.config(text=f"{stats['files']} files, {format_byte_summary(stats['bytes_before'], stats['bytes_after'], stats['reduced'])}")
+
+        self.settings = save_settings(directory, include_patterns, exclude_patterns, exclude_dir_patterns, respect_gitignore, reduce_options)
         self.update_dropdown()
 
         # 処理完了後の状態を更新
-        self.processing = False
-        self.btn.config(text="Get Files and Content", state="normal")
-        self.progress_frame.pack_forget()
+        self.finish_processing()
 
     def handle_error(self, error_message):
         """
@@ -683,10 +1385,11 @@ class FileContentViewer:
         """
         self.text_area.delete(1.0, tk.END)
         self.text_area.insert(tk.INSERT, f"Error: {error_message}")
+        self.result = []
+        self.manifest_dirs = []
+        self.result_label.config(text="")
 
-        self.processing = False
-        self.btn.config(text="Get Files and Content", state="normal")
-        self.progress_frame.pack_forget()
+        self.finish_processing()
 
     def update_dropdown(self):
         if not self.settings: